@@ -12,7 +12,8 @@
 
 from typing import Optional, Any, Tuple, List
 import datetime as dt
-import re, io
+import re, io, hashlib, operator
+from functools import reduce, lru_cache
 import numpy as np
 import pandas as pd
 import plotly.express as px
@@ -37,6 +38,7 @@ GREY  = "#939598"
 BLUE  = "#00AEDA"
 
 # Helpers to create brand-based gradient colours (no extra hues)
+@lru_cache(maxsize=64)  # only a handful of brand hexes ever come through here
 def _hex_to_rgb(h: str) -> Tuple[int,int,int]:
     h = h.lstrip("#")
     return tuple(int(h[i:i+2], 16) for i in (0,2,4))  # type: ignore
@@ -55,6 +57,10 @@ def blend(c1: str, c2: str, t: float) -> str:
 def distinct_brand_colors(n: int) -> List[str]:
     """Return n visually distinct colours using only BLUE↔BLACK↔GREY↔WHITE gradients.
        Ensures the 4 base swatches appear at most once each."""
+    return list(_brand_colors(n))  # fresh list per caller; the palette itself is memoized
+
+@lru_cache(maxsize=128)
+def _brand_colors(n: int) -> Tuple[str, ...]:
     anchors = [BLUE, BLACK, GREY, WHITE]
     seq: List[str] = []
     order = [BLUE, BLACK, GREY, WHITE]
@@ -62,7 +68,7 @@ def distinct_brand_colors(n: int) -> List[str]:
         if len(seq) < n:
             seq.append(c)
     if len(seq) >= n:
-        return seq[:n]
+        return tuple(seq[:n])
     legs = [(BLUE, BLACK), (BLACK, GREY), (GREY, WHITE), (WHITE, BLUE)]
     needed = n - len(seq)
     steps_per_leg = max(2, int(np.ceil(needed / len(legs))) + 1)
@@ -74,7 +80,7 @@ def distinct_brand_colors(n: int) -> List[str]:
     seen = set(x.upper() for x in seq)
     out = [c for c in extras if c.upper() not in seen]
     seq.extend(out[:needed])
-    return seq[:n]
+    return tuple(seq[:n])
 
 # Status colours mapped to brand-only choices.
 SJCPL_STATUS = {
@@ -164,74 +170,114 @@ def show_chart(fig, key: str):
         st.warning(f"Chart failed ({key}): {e}")
 
 # ---------- Explicit date/time parsing ----------
-_date_ddmmyyyy_slash = re.compile(r"^\s*(\d{1,2})/(\d{1,2})/(\d{2,4})\s*$")
-_date_ddmmyyyy_dash  = re.compile(r"^\s*(\d{1,2})-(\d{1,2})-(\d{2,4})\s*$")
-_date_yyyymmdd_dash  = re.compile(r"^\s*(\d{4})-(\d{1,2})-(\d{1,2})\s*$")
-_time_hhmm_ampm      = re.compile(r"^\s*(\d{1,2}):(\d{2})(?::(\d{2}))?\s*([ap]\.?m\.?)\s*$", re.I)
-_time_hhmm_24        = re.compile(r"^\s*(\d{1,2}):(\d{2})(?::(\d{2}))?\s*$")
-
-def _norm_year(y: int) -> int:
-    if y < 100: return 2000 + y if y < 70 else 1900 + y
-    return y
-
-def _normalize_date_str(s: str) -> str:
-    if not s or s.lower() in ("nan", "nat", "none"): return ""
-    s = s.strip()
-    m = _date_ddmmyyyy_slash.match(s) or _date_ddmmyyyy_dash.match(s)
-    if m:
-        d, mth, y = int(m.group(1)), int(m.group(2)), _norm_year(int(m.group(3)))
-        try: return f"{y:04d}-{mth:02d}-{d:02d}"
-        except Exception: return ""
-    m = _date_yyyymmdd_dash.match(s)
-    if m:
-        y, mth, d = int(m.group(1)), int(m.group(2)), int(m.group(3))
-        try: return f"{y:04d}-{mth:02d}-{d:02d}"
-        except Exception: return ""
-    return ""
-
-def _normalize_time_str(s: str) -> str:
-    if not s or s.lower() in ("nan", "nat", "none"): return ""
-    s0 = s.strip().lower().replace(".", "")
-    m = _time_hhmm_ampm.match(s0)
-    if m:
-        hh, mm = int(m.group(1)), int(m.group(2)); ss = int(m.group(3)) if m.group(3) else 0
-        ampm = m.group(4).lower()
-        if "pm" in ampm and hh < 12: hh += 12
-        if "am" in ampm and hh == 12: hh = 0
-        if not (0 <= hh <= 23 and 0 <= mm <= 59 and 0 <= ss <= 59): return ""
-        return f"{hh:02d}:{mm:02d}:{ss:02d}"
-    m = _time_hhmm_24.match(s0)
-    if m:
-        hh, mm = int(m.group(1)), int(m.group(2)); ss = int(m.group(3)) if m.group(3) else 0
-        if not (0 <= hh <= 23 and 0 <= mm <= 59 and 0 <= ss <= 59): return ""
-        return f"{hh:02d}:{mm:02d}:{ss:02d}"
-    return ""
-
-def _normalize_series_date(s: pd.Series) -> pd.Series:
-    return s.astype(str).map(_normalize_date_str)
-
-def _normalize_series_time(s: pd.Series) -> pd.Series:
-    return s.astype(str).map(_normalize_time_str)
+# One alternation per field so a single str.extract scan covers every accepted layout
+_date_any = re.compile(
+    r"^\s*(?:(?P<y1>\d{4})-(?P<m1>\d{1,2})-(?P<d1>\d{1,2})"              # YYYY-MM-DD
+    r"|(?P<d2>\d{1,2})(?P<sep>[/-])(?P<m2>\d{1,2})(?P=sep)(?P<y2>\d{2,4}))\s*$"  # DD/MM/YY[YY] or DD-MM-YY[YY]
+)
+_time_any = re.compile(r"^\s*(?P<hh>\d{1,2}):(?P<mm>\d{2})(?::(?P<ss>\d{2}))?\s*(?P<ampm>[ap]m)?\s*$")
+
+def _int_field(*parts: pd.Series) -> np.ndarray:
+    out = parts[0]
+    for p in parts[1:]:
+        out = out.fillna(p)
+    return out.fillna("0").astype("int64").to_numpy()
+
+def _days_from_civil(y: np.ndarray, m: np.ndarray, d: np.ndarray) -> np.ndarray:
+    """Days since 1970-01-01 for proleptic-Gregorian y/m/d int arrays."""
+    yy = y - (m <= 2)
+    era = yy // 400
+    yoe = yy - era * 400
+    doy = (153 * (m + np.where(m > 2, -3, 9)) + 2) // 5 + d - 1
+    return era * 146097 + yoe * 365 + yoe // 4 - yoe // 100 + doy - 719468
+
+_MONTH_DAYS = np.array([0, 31, 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31])
+
+def _date_fields(s: pd.Series) -> Tuple[np.ndarray, np.ndarray]:
+    """Vectorized date parse → (days since epoch, valid mask) for ISO and DD/MM/YY[YY] layouts."""
+    p = s.astype(str).str.extract(_date_any)
+    dmy = p["y2"].notna().to_numpy()
+    y, m, d = _int_field(p["y1"], p["y2"]), _int_field(p["m1"], p["m2"]), _int_field(p["d1"], p["d2"])
+    y = np.where(dmy & (y < 100), np.where(y < 70, y + 2000, y + 1900), y)  # 2-digit years: 00-69 → 20xx
+    leap = (y % 4 == 0) & ((y % 100 != 0) | (y % 400 == 0))
+    mdays = _MONTH_DAYS[np.clip(m, 0, 12)] + ((m == 2) & leap)
+    ok = (p["y1"].notna().to_numpy() | dmy) & (m >= 1) & (m <= 12) & (d >= 1) & (d <= mdays)
+    return _days_from_civil(y, m, d), ok
+
+def _time_fields(s: pd.Series) -> Tuple[np.ndarray, np.ndarray]:
+    """Vectorized time parse (12h am/pm or 24h) → (seconds since midnight, valid mask)."""
+    p = s.astype(str).str.lower().str.replace(".", "", regex=False).str.extract(_time_any)
+    hh, mm, ss = _int_field(p["hh"]), _int_field(p["mm"]), _int_field(p["ss"])
+    ampm = p["ampm"].fillna("").to_numpy()
+    hh = np.where((ampm == "pm") & (hh < 12), hh + 12, hh)
+    hh = np.where((ampm == "am") & (hh == 12), 0, hh)
+    ok = p["hh"].notna().to_numpy() & (hh <= 23) & (mm <= 59) & (ss <= 59)
+    return hh * 3600 + mm * 60 + ss, ok
+
+# DigiQC export shape ("19/09/2025" + "09:57 am") — parsed in one vectorized pass
+_EXPORT_DT_FORMAT = "%d/%m/%Y %I:%M %p"
+_NULL_STRS = ("", "nan", "nat", "none")
+_TS_MIN_S, _TS_MAX_S = -(-pd.Timestamp.min.value // 10**9), pd.Timestamp.max.value // 10**9
 
 def combine_datetime(date_series: pd.Series, time_series: pd.Series) -> pd.Series:
-    d = _normalize_series_date(date_series)
-    t = _normalize_series_time(time_series)
-    has_date = d != ""
-    t = np.where((t == "") & has_date, "00:00:00", t)
-    full = np.where(has_date, d + " " + t, "")
-    out = pd.to_datetime(full, format="%Y-%m-%d %H:%M:%S", errors="coerce")
+    # Already-typed dates (Excel datetime cells, Arrow timestamp columns): add the time of day, no string round-trip
+    # (Arrow reads date-only ISO columns as datetime.date objects; those take the string path below,
+    #  as do tz-aware columns from ISO strings with an offset, which the parsers below treat like any other text)
+    if pd.api.types.is_datetime64_any_dtype(date_series) and not isinstance(date_series.dtype, pd.DatetimeTZDtype):
+        if pd.api.types.is_timedelta64_dtype(time_series):
+            tod = time_series.fillna(pd.Timedelta(0))
+        else:
+            secs, t_ok = _time_fields(time_series.astype(str).str.strip())
+            tod = pd.Series(pd.to_timedelta(np.where(t_ok, secs, 0), unit="s"), index=time_series.index)
+        return (date_series.dt.normalize() + tod).astype("datetime64[ns]")
+
+    d = date_series.astype(str).str.strip()
+    t = time_series.astype(str).str.strip()
+    has_date = ~d.str.lower().isin(_NULL_STRS)
+    full = (d + " " + t).where(has_date)
+    out = pd.to_datetime(full, format=_EXPORT_DT_FORMAT, errors="coerce", cache=True)
+
+    # Other layouts (ISO dates, 24h / seconds, missing time): int fields → epoch seconds, only on rows the fast pass missed
+    retry = out.isna() & has_date
+    if retry.any():
+        days, d_ok = _date_fields(d[retry])
+        secs, t_ok = _time_fields(t[retry])
+        total = days * 86400 + np.where(t_ok, secs, 0)  # unparseable time → midnight
+        ok = d_ok & (total >= _TS_MIN_S) & (total <= _TS_MAX_S)
+        ns = np.where(ok, total * 1_000_000_000, np.iinfo(np.int64).min)
+        out[retry] = ns.view("datetime64[ns]")
     return out  # keep naive
 
 # ---------- Business rules ----------
+# Low-cardinality label columns used by the sidebar filters (stored as category dtype)
+FILTER_COLS = [
+    "Project Name", "Current Status",
+    "Type L0", "Type L1", "Type L2", "Tag 1", "Tag 2",
+    "Raised By", "Assigned Team", "Assigned Team User",
+]
+# Everything stored as category: the filter columns plus the Tower-Wise group key
+CATEGORY_COLS = FILTER_COLS + ["Location L1"]
+
 def _safe_get(df: pd.DataFrame, col: str) -> pd.Series:
     return df[col] if col in df.columns else pd.Series([np.nan] * len(df), index=df.index, name=col)
 
+def as_label_category(s: pd.Series) -> pd.Series:
+    """Category dtype with string categories; "—" is pre-registered so .fillna("—") keeps working."""
+    cat = s.where(s.isna(), s.astype(str)).astype("category")
+    if "—" not in cat.cat.categories:
+        cat = cat.cat.add_categories(["—"])
+    return cat
+
+def used_categories(s: pd.Series) -> List[str]:
+    """Sorted distinct non-null labels; category columns are read from their codes, not the strings."""
+    if isinstance(s.dtype, pd.CategoricalDtype):
+        codes = s.cat.codes.to_numpy()
+        return [str(c) for c in s.cat.categories[np.unique(codes[codes >= 0])]]
+    return sorted(s.dropna().astype(str).unique().tolist())
+
 def extract_location_variable(raw: pd.Series) -> pd.Series:
-    def _extract(val):
-        if pd.isna(val): return val
-        s = str(val)
-        return s.rsplit("/", 1)[-1].strip() if "/" in s else s.strip()
-    return raw.apply(_extract)
+    out = raw.astype(str).str.rsplit("/", n=1).str[-1].str.strip()
+    return out.where(raw.notna(), raw)
 
 def humanize_td(td: pd.Series) -> pd.Series:
     def _fmt(x):
@@ -250,16 +296,44 @@ def humanize_td(td: pd.Series) -> pd.Series:
 
 def style_status_rows(df: pd.DataFrame, theme_name: str) -> Styler:
     status_map = THEMES[theme_name]["status_map"]
-    def highlight(row):
-        status = str(row.get("Current Status", "")).strip()
-        bg = status_map.get(status, WHITE)
-        txt = WHITE if bg in (BLACK, GREY) else BLACK
-        return [f"background-color: {bg}; color: {txt};"] * len(row)
+    status = (df["Current Status"].astype(str).str.strip() if "Current Status" in df.columns
+              else pd.Series("", index=df.index))
+    bg = status.map(status_map).fillna(WHITE).astype(str)
+    txt = pd.Series(np.where(bg.isin([BLACK, GREY]), WHITE, BLACK), index=df.index)
+    css = ("background-color: " + bg + "; color: " + txt + ";").to_numpy()
     try:
-        return df.style.apply(highlight, axis=1)
+        # one CSS string per row, broadcast across the columns — a single axis=None apply
+        styles = pd.DataFrame(np.broadcast_to(css[:, None], df.shape), index=df.index, columns=df.columns)
+        return df.style.apply(lambda _: styles, axis=None)
     except Exception:
         return df  # fallback
 
+# Event → timestamp column; on equal timestamps the first listed event wins
+LAST_EVENT_COLS = {
+    "Responded": "_RespondedOnDT",
+    "Rejected":  "_RejectedOnDT",
+    "Closed":    "_ClosedOnDT",
+    "Effective": "_EffectiveResolutionDT",
+}
+
+def set_last_status_change(df: pd.DataFrame) -> pd.DataFrame:
+    """_LastStatusChangeDT = latest event timestamp, _LastStatusEvent = which event it was."""
+    available = {k: v for k, v in LAST_EVENT_COLS.items() if v in df.columns}
+    if not available:
+        df["_LastStatusChangeDT"] = pd.NaT
+        df["_LastStatusEvent"]    = None
+        return df
+
+    # (N, k) int64 view of the event stamps — NaT is the smallest int64, so max/argmax skip it for free
+    stamps = np.stack([df[c].to_numpy(dtype="datetime64[ns]").view("i8") for c in available.values()], axis=1)
+    last_i8 = np.maximum.reduce(stamps, axis=1)
+    none_mask = last_i8 == np.iinfo(np.int64).min
+    last_evt = np.array(list(available.keys()), dtype=object)[stamps.argmax(axis=1)]  # first max wins ties
+
+    df["_LastStatusChangeDT"] = last_i8.view("datetime64[ns]")
+    df["_LastStatusEvent"]    = pd.Series(last_evt, index=df.index).where(~none_mask, None)
+    return df
+
 def ensure_last_status_change(df: pd.DataFrame) -> pd.DataFrame:
     """Guarantee _LastStatusChangeDT/_LastStatusEvent exist, computing from available timestamps."""
     def ensure_series(df, out_col, dcol, tcol):
@@ -283,29 +357,10 @@ def ensure_last_status_change(df: pd.DataFrame) -> pd.DataFrame:
         eff.loc[mask_eff] = df.loc[mask_eff, "_RespondedOnDT"]
         df["_EffectiveResolutionDT"] = eff
 
-    # Compute last status change + event
-    ev_cols = ["_RespondedOnDT","_RejectedOnDT","_ClosedOnDT","_EffectiveResolutionDT"]
-    existing = [c for c in ev_cols if c in df.columns]
-    if existing:
-        sentinel = pd.Timestamp("1900-01-01 00:00:00")
-        evdf = df[existing].copy()
-        evdf_f = evdf.fillna(sentinel)
-        last_ts  = evdf_f.max(axis=1)
-        none_mask = evdf.notna().sum(axis=1) == 0
-        last_ts  = last_ts.mask(none_mask, pd.NaT)
-        last_col = evdf_f.idxmax(axis=1)
-        rev = {
-            "_RespondedOnDT":"Responded",
-            "_RejectedOnDT":"Rejected",
-            "_ClosedOnDT":"Closed",
-            "_EffectiveResolutionDT":"Effective",
-        }
-        df["_LastStatusChangeDT"] = last_ts
-        df["_LastStatusEvent"]    = last_col.map(rev).where(~none_mask, None)
-    else:
-        df["_LastStatusChangeDT"] = pd.NaT
-        df["_LastStatusEvent"]    = None
-    return df
+    # Compute last status change + event (already present on preprocessed frames — don't recompute per rerun)
+    if {"_LastStatusChangeDT", "_LastStatusEvent"}.issubset(df.columns):
+        return df
+    return set_last_status_change(df)
 
 # ---------- Derived columns (effective closure + flags + last status change) ----------
 def add_derived_columns(df: pd.DataFrame) -> pd.DataFrame:
@@ -332,6 +387,7 @@ def add_derived_columns(df: pd.DataFrame) -> pd.DataFrame:
     mask_eff = eff.isna() & df["_RespondedOnDT"].notna() & df["_RaisedOnDT"].notna() & (df["_RespondedOnDT"] > df["_RaisedOnDT"])
     eff.loc[mask_eff] = df.loc[mask_eff, "_RespondedOnDT"]
     df["_EffectiveResolutionDT"] = eff
+    df["_Resolved_Flag"] = df["_EffectiveResolutionDT"].notna().astype(int)  # groupby-sum instead of a per-group lambda
 
     # Timings
     df["Computed Closure Time (Hrs)"] = (df["_EffectiveResolutionDT"] - df["_RaisedOnDT"]).dt.total_seconds() / 3600.0
@@ -366,21 +422,27 @@ def add_derived_columns(df: pd.DataFrame) -> pd.DataFrame:
         df["Total Cost"] = pd.to_numeric(df["Total Cost"], errors="coerce").fillna(part_sum)
 
     # -------- Rejected → Closed flags (inferred + strict) --------
-    def _nz(series_name: str) -> pd.Series:
-        s = _safe_get(df, series_name)
-        return s.where(s.notna(), "").astype(str).str.strip()
+    def _any_text(cols: List[str]) -> np.ndarray:
+        # Non-blank value in any of cols — one string pass over the packed (N, k) block
+        present = [c for c in cols if c in df.columns]
+        if not present:
+            return np.zeros(len(df), dtype=bool)
+        flat = pd.Series(df[present].to_numpy(dtype=object).ravel())
+        filled = flat.notna().to_numpy() & flat.astype(str).str.strip().ne("").to_numpy()
+        return filled.reshape(len(df), len(present)).any(axis=1)
 
     has_reject_evidence = (
-        df["_RejectedOnDT"].notna() |
-        _nz("Rejected By").ne("") | _nz("Rejected Comment").ne("") |
-        _nz("Rejected On Date").ne("") | _nz("Rejected On Time").ne("")
+        df["_RejectedOnDT"].notna().to_numpy() |
+        _any_text(["Rejected By", "Rejected Comment", "Rejected On Date", "Rejected On Time"])
     )
-    cur_status = _nz("Current Status").str.lower()
-    closedish  = cur_status.str.contains(r"\b(closed|approved|resolved|complete)\b", regex=True)
+    # Status regex runs once per distinct status, then maps back through the category codes
+    status_cat = _safe_get(df, "Current Status").astype("category").cat
+    hit_codes  = np.flatnonzero(status_cat.categories.astype(str).str.lower()
+                                .str.contains(r"\b(closed|approved|resolved|complete)\b", regex=True))
+    closedish  = np.isin(status_cat.codes.to_numpy(), hit_codes)
     has_close_evidence = (
-        df["_ClosedOnDT"].notna() | closedish |
-        _nz("Closed By").ne("") | _nz("Closed Comment").ne("") |
-        _nz("Closed On Date").ne("") | _nz("Closed On Time").ne("")
+        df["_ClosedOnDT"].notna().to_numpy() | closedish |
+        _any_text(["Closed By", "Closed Comment", "Closed On Date", "Closed On Time"])
     )
     df["_R2C_Flag"] = (has_reject_evidence & has_close_evidence).astype(int)
 
@@ -390,28 +452,7 @@ def add_derived_columns(df: pd.DataFrame) -> pd.DataFrame:
     df["R2C Hours (>=0)"] = np.where(np.isfinite(dur_hours), np.maximum(dur_hours, 0.0), np.nan)
 
     # -------- Last Status Change (vectorized) --------
-    event_cols = {
-        "Responded": "_RespondedOnDT",
-        "Rejected":  "_RejectedOnDT",
-        "Closed":    "_ClosedOnDT",
-        "Effective": "_EffectiveResolutionDT",
-    }
-    available = [c for c in event_cols.values() if c in df.columns]
-    if available:
-        sentinel = pd.Timestamp("1900-01-01 00:00:00")
-        evdf = df[available].copy()
-        evdf_f = evdf.fillna(sentinel)
-        last_ts = evdf_f.max(axis=1)
-        none_mask = evdf.notna().sum(axis=1) == 0
-        last_ts = last_ts.mask(none_mask, pd.NaT)
-        last_col = evdf_f.idxmax(axis=1)
-        last_col = last_col.mask(none_mask, None)
-        rev = {v: k for k, v in event_cols.items()}
-        df["_LastStatusChangeDT"] = last_ts
-        df["_LastStatusEvent"] = last_col.map(rev).where(~none_mask, None)
-    else:
-        df["_LastStatusChangeDT"] = pd.NaT
-        df["_LastStatusEvent"] = None
+    df = set_last_status_change(df)
 
     # -------- Calendar splits for extra timelines --------
     if df["_RaisedOnDT"].notna().any():
@@ -425,6 +466,11 @@ def add_derived_columns(df: pd.DataFrame) -> pd.DataFrame:
         df["_RaisedDOW"]  = np.nan
         df["_RaisedHour"] = np.nan
 
+    # -------- Filter / group-key columns → category (cheaper isin / groupby, smaller frame) --------
+    for c in CATEGORY_COLS:
+        if c in df.columns:
+            df[c] = as_label_category(df[c])
+
     return df
 
 def _to_label(x) -> str:
@@ -434,11 +480,37 @@ def _to_label(x) -> str:
     s = str(x).strip()
     return s if s else "—"
 
+def top_label_counts(s: pd.Series, topn: int) -> pd.Series:
+    """value_counts of _to_label(s), computed with a bincount over category codes.
+       Labels are derived per category (not per row); same first-appearance + sort as value_counts."""
+    cat = (s if isinstance(s.dtype, pd.CategoricalDtype) else s.astype("category")).cat
+    codes = cat.codes.to_numpy()
+    cnt = np.bincount(codes + 1, minlength=len(cat.categories) + 1)  # slot 0 = missing
+    labels = np.array(["—"] + [_to_label(c) for c in cat.categories], dtype=object)
+    seen = pd.unique(codes) + 1  # first-appearance order, as value_counts breaks ties
+    per_label = pd.Series(cnt[seen], index=labels[seen]).groupby(level=0, sort=False).sum()
+    return per_label.sort_values(ascending=False).head(topn)
+
+def flag_counts_by(df: pd.DataFrame, col: str, flag_cols: List[str]) -> dict:
+    """{flag: value_counts of col.fillna("—") over rows where flag == 1}, from one read of col's category codes.
+       Each flag is a bincount over the codes; ties keep value_counts' first-appearance order."""
+    s = df[col]
+    cat = (s if isinstance(s.dtype, pd.CategoricalDtype) else s.astype("category")).cat
+    codes = cat.codes.to_numpy() + 1  # slot 0 = missing
+    labels = np.array(["—"] + [str(c) for c in cat.categories], dtype=object)
+    out = {}
+    for f in flag_cols:
+        hit = codes[df[f].to_numpy() == 1]
+        cnt = np.bincount(hit, minlength=len(labels))
+        seen = pd.unique(hit)
+        per_label = pd.Series(cnt[seen], index=labels[seen]).groupby(level=0, sort=False).sum()
+        out[f] = per_label.sort_values(ascending=False)
+    return out
+
 def bar_top_counts(df: pd.DataFrame, col: str, topn: int = 10, template="plotly_white", theme_name: str="SJCPL"):
     if col not in df.columns:
         return px.bar(pd.DataFrame({col: [], "count": []}), x="count", y=col, template=template)
-    labels = df[col].apply(_to_label)
-    vc = labels.value_counts(dropna=False).head(topn)
+    vc = top_label_counts(df[col], topn)
     counts = pd.DataFrame({col: vc.index.astype(str).tolist(), "count": vc.values})
     fig = px.bar(
         counts.sort_values("count", ascending=True),
@@ -458,18 +530,34 @@ def _clean_hours_for_hist(s: pd.Series) -> pd.Series:
         x = x[x <= cap]
     return x
 
+@st.cache_data(show_spinner=False, max_entries=16)
+def _hist_counts(values: np.ndarray, bins: int = 30) -> Tuple[np.ndarray, np.ndarray]:
+    return np.histogram(values, bins=bins)
+
+def hours_histogram(series: pd.Series, title: str, color: str, theme_name: str, bins: int = 30):
+    """Histogram binned server-side: the figure carries `bins` bars instead of every value."""
+    counts, edges = _hist_counts(series.to_numpy(dtype=float), bins)
+    fig = go.Figure(go.Bar(
+        x=(edges[:-1] + edges[1:]) / 2, y=counts, width=np.diff(edges),
+        customdata=np.column_stack([edges[:-1], edges[1:]]), opacity=0.9, marker_color=color,
+        hovertemplate="%{customdata[0]:.1f}–%{customdata[1]:.1f} h<br>count=%{y}<extra></extra>",
+        showlegend=False,
+    ))
+    fig.update_layout(title=title, xaxis_title=title, yaxis_title="count")
+    return style_fig(fig, theme_name)
+
 def metrics_summary(df: pd.DataFrame, theme_name: str):
     total_issues = len(df)
     resolved = (df["_EffectiveResolutionDT"].notna()).sum()
     open_issues = total_issues - resolved
-    median_response = pd.to_timedelta(df["Responding Time (Hrs)"], unit="h").median(skipna=True)
-    median_close    = pd.to_timedelta(df["Computed Closure Time (Hrs)"], unit="h").median(skipna=True)
+    median_response = pd.to_numeric(df["Responding Time (Hrs)"], errors="coerce").median(skipna=True)
+    median_close    = pd.to_numeric(df["Computed Closure Time (Hrs)"], errors="coerce").median(skipna=True)
     sla_known = df["SLA Met"].dropna() if "SLA Met" in df.columns else pd.Series(dtype=float)
     sla_rate = (sla_known.mean() * 100) if len(sla_known) else np.nan
 
-    def _fmt(td):
-        if pd.isna(td): return "—"
-        secs = int(td.total_seconds())
+    def _fmt(hours):
+        if pd.isna(hours): return "—"
+        secs = int(round(hours * 3600))  # hours come from whole seconds; round off float noise
         d, r = divmod(secs, 86400); h, r = divmod(r, 3600); m, _ = divmod(r, 60)
         if d or h or m: return f"{d}d {h}h {m}m"
         return "0m"
@@ -565,43 +653,65 @@ def _latest_github_raw_url(prefix: str = "CSV-INSTRUCTION-DETAIL-REPORT-", suffi
     except Exception:
         return None
 
-def load_data(file: Optional[io.BytesIO]) -> pd.DataFrame:
+DEMO_CSV_URL = f"https://raw.githubusercontent.com/{GITHUB_OWNER}/{GITHUB_REPO}/main/{GITHUB_DIR}/CSV-INSTRUCTION-DETAIL-REPORT-09-10-2025-09-12-02.csv"
+
+class DataLoadError(ValueError):
+    """The source file could not be fetched or read (shown to the user instead of a traceback)."""
+
+@st.cache_data(ttl=3600, show_spinner=False)
+def fetch_demo_csv() -> Tuple[bytes, str]:
     """
-    Robust reader:
-      - If file is None: auto-pick the latest CSV from GitHub /data (by timestamp in filename)
-      - Else: try Excel, else CSV with multiple encodings
-      - Normalize column names and drop duplicate columns
+    Download the latest CSV from GitHub /data (falls back to the pinned demo file).
+    Returns (raw bytes, file name); raises if nothing could be fetched so failures aren't cached.
     """
-    if file is None:
-        # Fallback path (kept from your code; used if auto-pick fails)
-        default_path = "https://raw.githubusercontent.com/dnyanesh57/NC_Dashboard/main/data/CSV-INSTRUCTION-DETAIL-REPORT-09-10-2025-09-12-02.csv"
+    for url in (_latest_github_raw_url(), DEMO_CSV_URL):
+        if not url:
+            continue
         try:
-            url = _latest_github_raw_url()
-            if url:
-                df = pd.read_csv(url)
-            else:
-                df = pd.read_csv(default_path)
+            with urllib.request.urlopen(url, timeout=15) as resp:
+                return resp.read(), url.rsplit("/", 1)[-1]
         except Exception:
+            continue
+    raise DataLoadError("No file uploaded and demo CSV not available.")
+
+def _read_csv_arrow(raw_bytes: bytes, encoding: Optional[str]) -> Optional[pd.DataFrame]:
+    """Multithreaded pyarrow CSV read (the per-row tokenizing runs in Arrow's C++ reader, not Python).
+       Returns None when pyarrow is unavailable or can't match the C reader's frame."""
+    try:
+        df = pd.read_csv(io.BytesIO(raw_bytes), encoding=encoding, engine="pyarrow")
+    except Exception:
+        return None
+    if df.columns.duplicated().any():  # C reader mangles duplicates to "X.1"
+        return None
+    obj = df.select_dtypes(include="object")
+    for c in obj.columns:
+        i = obj[c].first_valid_index()
+        if i is not None and isinstance(obj.at[i, c], bytes):  # undecodable text → let the C reader try other encodings
+            return None
+    df[obj.columns] = obj.where(obj.notna(), np.nan)  # arrow nulls arrive as None
+    return df
+
+def load_data(raw_bytes: bytes, name: str) -> pd.DataFrame:
+    """
+    Robust reader:
+      - Excel by extension, else CSV with multiple encodings (pyarrow engine first, C engine fallback)
+      - Normalize column names and drop duplicate columns
+    """
+    name = (name or "uploaded.csv").lower()
+    if name.endswith(".xlsx") or name.endswith(".xls"):
+        df = pd.read_excel(io.BytesIO(raw_bytes))
+    else:
+        for enc in [None, "utf-8", "utf-8-sig", "latin-1"]:
+            df = _read_csv_arrow(raw_bytes, enc)
+            if df is not None:
+                break
             try:
-                df = pd.read_csv(default_path)
+                df = pd.read_csv(io.BytesIO(raw_bytes), encoding=enc)
+                break
             except Exception:
-                st.error("No file uploaded and demo CSV not available.")
-                st.stop()
-    else:
-        name = getattr(file, "name", "uploaded.csv").lower()
-        if name.endswith(".xlsx") or name.endswith(".xls"):
-            df = pd.read_excel(file)
+                continue
         else:
-            for enc in [None, "utf-8", "utf-8-sig", "latin-1"]:
-                try:
-                    file.seek(0)
-                    df = pd.read_csv(file, encoding=enc)
-                    break
-                except Exception:
-                    continue
-            else:
-                st.error("Could not read the uploaded CSV with common encodings.")
-                st.stop()
+            raise DataLoadError("Could not read the uploaded CSV with common encodings.")
 
     df = df.rename(columns={c: normalize_colname(c) for c in df.columns})
     df = df.loc[:, ~pd.Series(df.columns).duplicated().values]
@@ -609,7 +719,8 @@ def load_data(file: Optional[io.BytesIO]) -> pd.DataFrame:
 
 
 def preprocess(df_in: pd.DataFrame) -> pd.DataFrame:
-    df = df_in.copy()
+    """Derive the dashboard columns in place — df_in is the freshly loaded frame owned by load_and_preprocess."""
+    df = df_in
     df.columns = [c.strip() for c in df.columns]
 
     # >>> UPDATED: Ignore TRAINING PROJECT and SJ TRaining Project
@@ -620,18 +731,42 @@ def preprocess(df_in: pd.DataFrame) -> pd.DataFrame:
                .str.replace(r"\s+", " ", regex=True)
                .str.strip()
                .str.casefold())
-        df = df[~_pn.isin(ignored_projects)].copy()
+        df = df.take(np.flatnonzero(~_pn.isin(ignored_projects).to_numpy()))  # take(): one copy, not flagged as a slice
     # <<< UPDATED
 
     return add_derived_columns(df)
 
 
-if uploaded is not None:
-    df_raw = load_data(uploaded)
-else:
-    df_raw = load_data(None)
+@st.cache_data(show_spinner=False, max_entries=4, ttl=6 * 3600)  # full frames, shared by all sessions: keep few
+def load_and_preprocess(raw_bytes: bytes, name: str) -> pd.DataFrame:
+    """Cached on the file bytes + name, so reruns don't re-hash or re-derive the frame."""
+    df = preprocess(load_data(raw_bytes, name))
+    df.attrs["source_digest"] = hashlib.md5(raw_bytes).hexdigest()
+    return df
+
+
+def frame_key(df: pd.DataFrame) -> Tuple:
+    """
+    Cheap cache key for frames cut from the loaded register (used as hash_funcs for st.cache_data):
+    source file digest + columns + row labels, instead of hashing every cell.
+    """
+    return (
+        df.attrs.get("source_digest"),
+        tuple(df.columns),
+        len(df),
+        int(pd.util.hash_pandas_object(df.index, index=False).sum()),
+    )
+
 
-df = preprocess(df_raw)
+try:
+    if uploaded is not None:
+        src_bytes, src_name = uploaded.getvalue(), uploaded.name
+    else:
+        src_bytes, src_name = fetch_demo_csv()
+    df = load_and_preprocess(src_bytes, src_name)
+except DataLoadError as e:
+    st.error(str(e))
+    st.stop()
 
 # ---------- Show logo if provided ----------
 st.markdown(
@@ -659,43 +794,44 @@ def get_date_range_inputs(df: pd.DataFrame) -> Tuple[Optional[dt.date], Optional
         return picked[0], picked[1]
     return picked, picked
 
+FILTER_WIDGETS = list(zip(FILTER_COLS, [  # (column, widget key) — the widget label is the column name
+    "f-proj", "f-status",
+    "f-typeL0", "f-typeL1", "f-typeL2", "f-tag1", "f-tag2",
+    "f-raisedby", "f-ateam", "f-auser",
+]))
+
+@st.cache_data(show_spinner=False, max_entries=4, ttl=6 * 3600, hash_funcs={pd.DataFrame: frame_key})  # entries can be register-sized
+def apply_filters(df: pd.DataFrame, selections: dict, date_min: Optional[dt.date], date_max: Optional[dt.date]) -> pd.DataFrame:
+    """Pure mask construction for the sidebar filters; cached on (frame key, selections, date range)."""
+    def match_codes(col: str, sel: list) -> np.ndarray:
+        cat = df[col].cat  # filter columns are category dtype (add_derived_columns)
+        wanted = cat.categories.get_indexer([str(x) for x in sel])
+        return np.isin(cat.codes.to_numpy(), wanted[wanted >= 0])
+
+    m = reduce(operator.and_, (match_codes(col, sel) for col, sel in selections.items() if sel),
+               np.ones(len(df), dtype=bool))
+    if date_min:      m &= (df["_RaisedOnDT"].dt.date >= date_min).fillna(False).to_numpy()
+    if date_max:      m &= (df["_RaisedOnDT"].dt.date <= date_max).fillna(False).to_numpy()
+
+    return df.take(np.flatnonzero(m))  # already a fresh frame; st.cache_data hands callers their own copy on hits
+
+def filter_options(df: pd.DataFrame) -> dict:
+    """Sidebar option lists, built once per upload and kept in session_state under the source digest."""
+    digest = df.attrs.get("source_digest")
+    cached = st.session_state.get("_filter_opts")
+    if digest is None or cached is None or cached[0] != digest:
+        cached = (digest, {col: used_categories(df[col]) for col in FILTER_COLS if col in df.columns})
+        st.session_state["_filter_opts"] = cached
+    return cached[1]
+
 def filtered_view(df: pd.DataFrame) -> pd.DataFrame:
     with st.sidebar:
         st.markdown("#### Filters")
-        def options(col: str):
-            return sorted(df.get(col, pd.Series(dtype=str)).dropna().astype(str).unique().tolist())
-        proj          = st.multiselect("Project Name", options("Project Name"), key="f-proj")
-        status        = st.multiselect("Current Status", options("Current Status"), key="f-status")
-        types_l0      = st.multiselect("Type L0", options("Type L0"), key="f-typeL0")
-        types_l1      = st.multiselect("Type L1", options("Type L1"), key="f-typeL1")
-        types_l2      = st.multiselect("Type L2", options("Type L2"), key="f-typeL2")
-        tags1         = st.multiselect("Tag 1", options("Tag 1"), key="f-tag1")
-        tags2         = st.multiselect("Tag 2", options("Tag 2"), key="f-tag2")
-        raised_by     = st.multiselect("Raised By", options("Raised By"), key="f-raisedby")
-        assigned_team = st.multiselect("Assigned Team", options("Assigned Team"), key="f-ateam")
-        assigned_user = st.multiselect("Assigned Team User", options("Assigned Team User"), key="f-auser")
+        opts = filter_options(df)
+        selections = {col: st.multiselect(col, opts.get(col, []), key=key) for col, key in FILTER_WIDGETS}
         date_min, date_max = get_date_range_inputs(df)
 
-    m = np.ones(len(df), dtype=bool)
-    def match(col: str, sel: list):
-        if sel:
-            return df.get(col).astype(str).isin([str(x) for x in sel]).to_numpy()
-        return np.ones(len(df), dtype=bool)
-
-    if proj:          m &= match("Project Name", proj)
-    if status:        m &= match("Current Status", status)
-    if types_l0:      m &= match("Type L0", types_l0)
-    if types_l1:      m &= match("Type L1", types_l1)
-    if types_l2:      m &= match("Type L2", types_l2)
-    if tags1:         m &= match("Tag 1", tags1)
-    if tags2:         m &= match("Tag 2", tags2)
-    if raised_by:     m &= match("Raised By", raised_by)
-    if assigned_team: m &= match("Assigned Team", assigned_team)
-    if assigned_user: m &= match("Assigned Team User", assigned_user)
-    if date_min:      m &= (df["_RaisedOnDT"].dt.date >= date_min).fillna(False).to_numpy()
-    if date_max:      m &= (df["_RaisedOnDT"].dt.date <= date_max).fillna(False).to_numpy()
-
-    return df.loc[m].copy()
+    return apply_filters(df, selections, date_min, date_max)
 
 df_filtered = filtered_view(df)
 st.divider()
@@ -710,8 +846,68 @@ r2c_count_scope     = int(mask_r2c_inferred.sum())
 resp_only_count     = int(mask_responly.sum())
 total_ncs_scope     = len(df_filtered)
 
-# ---------- Tabs (added "Status") ----------
-tabs = st.tabs([
+# ---------- Cached tab aggregations (keyed on frame_key, so UI-only reruns skip the groupby) ----------
+METRIC_COLS = ["Total", "Resolved", "R2C", "RespOnly"]
+
+# group key → (columns shown by its tab, metrics drawn in the grouped bar)
+GROUP_AGG_SPECS = {
+    "Project Name":       (METRIC_COLS + ["Median_Close_Hrs", "SLA_Met"], METRIC_COLS),
+    "Location L1":        (METRIC_COLS, METRIC_COLS),
+    "Assigned Team User": (METRIC_COLS + ["Median_Close_Hrs"], ["Resolved", "R2C", "RespOnly"]),
+}
+# Axis / legend titles for wide-form px.bar(y=[metric cols]) — same as the old melted (Metric, Count) frames
+WIDE_BAR_LABELS = {"value": "Count", "variable": "Metric"}
+
+@st.cache_data(show_spinner=False, max_entries=32, hash_funcs={pd.DataFrame: frame_key})
+def all_group_aggs(df: pd.DataFrame) -> dict:
+    """Project / tower / user aggregates in one cached call: key → agg frame (one row per group)."""
+    out = {}
+    for key, (cols, _) in GROUP_AGG_SPECS.items():
+        if key not in df.columns:
+            continue
+        named = {
+            "Total": ("Reference ID","count") if "Reference ID" in df.columns else (key,"count"),
+            "Resolved": ("_Resolved_Flag", "sum"),
+            "R2C": ("_R2C_Flag", "sum"),
+            "RespOnly": ("_RespondedNotClosed_Flag", "sum"),
+            "Median_Close_Hrs": ("Computed Closure Time (Hrs)", "median"),
+            "SLA_Met": ("SLA Met", "mean"),  # SLA Met is float 1/0/NaN already, so this is the numeric mean kernel
+        }
+        # Only the reductions this key's table keeps (median / SLA are not shown for towers)
+        grp = df.groupby(key, sort=False, observed=True).agg(**{c: named[c] for c in cols})
+        grp = grp.sort_index().reset_index()[[key] + cols]  # order the groups, not the rows
+        if "SLA_Met" in grp.columns:
+            grp["SLA_Met"] = (grp["SLA_Met"] * 100).round(1)
+        out[key] = grp
+    return out
+
+@st.cache_data(show_spinner=False, max_entries=32, hash_funcs={pd.DataFrame: frame_key})
+def timeline_agg(df: pd.DataFrame) -> pd.DataFrame:
+    """Daily Raised / Resolved / R2C / RespOnly plus the cumulative backlog."""
+    work = df.copy()
+    work["Date"] = work["_RaisedOnDT"].dt.date
+    series = work.groupby("Date").agg(
+        Raised=("Reference ID", "count") if "Reference ID" in work.columns else ("Date","count"),
+        Resolved=("_Resolved_Flag", "sum"),
+        R2C=("_R2C_Flag", "sum"),
+        RespOnly=("_RespondedNotClosed_Flag", "sum"),
+    ).reset_index()
+    series["RaisedCum"]   = series["Raised"].cumsum()
+    series["ResolvedCum"] = series["Resolved"].cumsum()
+    series["Backlog"]     = series["RaisedCum"] - series["ResolvedCum"]
+    return series
+
+@st.cache_data(show_spinner=False, max_entries=4, ttl=6 * 3600, hash_funcs={pd.DataFrame: frame_key})
+def csv_bytes(df: pd.DataFrame) -> bytes:
+    """UTF-8 CSV for download buttons; serialized once per (frame key), written in row chunks."""
+    buf = io.BytesIO()
+    df.to_csv(buf, index=False, encoding="utf-8", chunksize=50_000)
+    return buf.getvalue()
+
+# ---------- Sections (added "Status") ----------
+# Radio navigation instead of st.tabs: st.tabs runs every tab body (groupbys + figure JSON) on each rerun,
+# while only the selected section's block below executes here.
+SECTIONS = [
     "Overview",
     "Status",
     "Project Status",
@@ -723,10 +919,11 @@ tabs = st.tabs([
     "NC-View",
     "Sketch-View",
     "NC Table",
-])
+]
+active_section = st.radio("Section", SECTIONS, horizontal=True, key="nav-section", label_visibility="collapsed")
 
 # ---------- Overview ----------
-with tabs[0]:
+if active_section == "Overview":
     st.header("Overview")
     metrics_summary(df_filtered, theme)
 
@@ -741,9 +938,8 @@ with tabs[0]:
     show_chart(style_fig(fig_comp, theme), key="ov-comp-r2c")
 
     if "Assigned Team User" in df_filtered.columns and resp_only_count > 0:
-        resp_counts = (df_filtered.loc[mask_responly, "Assigned Team User"]
-                       .fillna("—").astype(str)
-                       .value_counts().rename_axis("Assignee").reset_index(name="Responded not Closed"))
+        resp_counts = (flag_counts_by(df_filtered, "Assigned Team User", ["_RespondedNotClosed_Flag"])["_RespondedNotClosed_Flag"]
+                       .rename_axis("Assignee").reset_index(name="Responded not Closed"))
         fig_resp_only = px.bar(
             resp_counts.sort_values("Responded not Closed"),
             x="Responded not Closed", y="Assignee", orientation="h",
@@ -765,7 +961,8 @@ with tabs[0]:
         show_chart(style_fig(fig_rb, theme), key="ov-responded-not-closed-raisedby")
 
     if "Current Status" in df_filtered.columns:
-        vc = df_filtered["Current Status"].value_counts(dropna=False).reset_index()
+        vc = df_filtered["Current Status"].value_counts(dropna=False)
+        vc = vc[vc > 0].reset_index()
         vc.columns = ["Current Status","Count"]
         fig_sd = px.bar(vc, x="Current Status", y="Count", text_auto=True, title="Current Status Distribution",
                         color="Current Status", color_discrete_sequence=distinct_brand_colors(len(vc)))
@@ -777,27 +974,13 @@ with tabs[0]:
     with c3:
         series = _clean_hours_for_hist(df_filtered["Responding Time (Hrs)"])
         if len(series):
-            fig = px.histogram(
-                x=series, nbins=30,
-                labels={"x": "Responding Time (Hrs)"},
-                opacity=0.9, color_discrete_sequence=[metric_colors["RespOnly"]]
-            )
-            fig.update_traces(showlegend=False)
-            fig.update_layout(title="Responding Time (Hrs)")
-            show_chart(style_fig(fig, theme), key="tab0-hist-responding")
+            show_chart(hours_histogram(series, "Responding Time (Hrs)", metric_colors["RespOnly"], theme), key="tab0-hist-responding")
         else:
             st.info("No data for Responding Time.")
     with c4:
         series = _clean_hours_for_hist(df_filtered["Computed Closure Time (Hrs)"])
         if len(series):
-            fig = px.histogram(
-                x=series, nbins=30,
-                labels={"x": "Computed Closure Time (Hrs)"},
-                opacity=0.9, color_discrete_sequence=[metric_colors["Resolved"]]
-            )
-            fig.update_traces(showlegend=False)
-            fig.update_layout(title="Computed Closure Time (Hrs)")
-            show_chart(style_fig(fig, theme), key="tab0-hist-closure")
+            show_chart(hours_histogram(series, "Computed Closure Time (Hrs)", metric_colors["Resolved"], theme), key="tab0-hist-closure")
         else:
             st.info("No data for Computed Closure Time.")
 
@@ -815,9 +998,10 @@ with tabs[0]:
             show_chart(style_fig(fig, theme), key="ov-sla-donut")
     with cB:
         if "_R2C_Flag" in df_filtered.columns and len(df_filtered):
-            temp = df_filtered.copy()
-            temp["R2C State"] = np.where(temp["_R2C_Flag"] == 1, "R2C", "Non-R2C")
-            vc = temp["R2C State"].value_counts().rename_axis("R2C").reset_index(name="Count")
+            flags = df_filtered["_R2C_Flag"].to_numpy()
+            r2c = int(np.count_nonzero(flags == 1))
+            vc = pd.DataFrame({"R2C": ["R2C", "Non-R2C"], "Count": [r2c, flags.size - r2c]})
+            vc = vc[vc["Count"] > 0].sort_values("Count", ascending=False, kind="stable")
             fig = px.pie(vc, names="R2C", values="Count", hole=0.6,
                          color="R2C", color_discrete_sequence=distinct_brand_colors(len(vc)))
             fig.update_layout(title="R2C — Overall Split (inferred)")
@@ -833,7 +1017,7 @@ with tabs[0]:
             show_chart(style_fig(fig, theme), key="ov-sunburst")
 
 # ---------- Status (extended) ----------
-with tabs[1]:
+if active_section == "Status":
     st.header("Status")
     st.caption("See which NCs changed status Today, in the Last 3 days, or in This week.")
 
@@ -861,7 +1045,7 @@ with tabs[1]:
         m = last_change.notna()
         window_label = "All available"
 
-    changed = df_filtered.loc[m & last_change.notna()].copy()
+    changed = df_filtered.loc[m & last_change.notna()]  # read-only below; the boolean mask already copies
 
     count_changed = len(changed)
     total_in_scope = len(df_filtered)
@@ -888,10 +1072,10 @@ with tabs[1]:
         k1,k2 = st.columns(2)
         with k1:
             if "_R2C_Flag" in changed.columns:
-                st.metric("R2C in window (inferred)", int(changed["_R2C_Flag"].sum()))
+                st.metric("R2C in window (inferred)", np.count_nonzero(changed["_R2C_Flag"].to_numpy()))
         with k2:
             if "_RespondedNotClosed_Flag" in changed.columns:
-                st.metric("Responded-not-Closed in window", int(changed["_RespondedNotClosed_Flag"].sum()))
+                st.metric("Responded-not-Closed in window", np.count_nonzero(changed["_RespondedNotClosed_Flag"].to_numpy()))
 
     if count_changed == 0:
         st.info("No status changes found for the selected period and filters.")
@@ -916,7 +1100,7 @@ with tabs[1]:
         with cA:
             # Top Projects
             if "Project Name" in changed.columns:
-                top_proj = (changed["Project Name"].fillna("—").value_counts()
+                top_proj = (changed["Project Name"].fillna("—").astype(str).value_counts()
                             .rename_axis("Project").reset_index(name="Count")).head(15)
                 fig_proj = px.bar(top_proj.sort_values("Count"),
                                   x="Count", y="Project", orientation="h",
@@ -935,8 +1119,9 @@ with tabs[1]:
                 show_chart(style_fig(fig_user, theme), key="st-user-bar")
 
         # Mini timeline: changes per day in window
-        changed["Change Date"] = changed["_LastStatusChangeDT"].dt.date
-        daily = changed.groupby("Change Date").size().reset_index(name="Count")
+        # Day keys stay datetime64 (floor, not .dt.date) so counting hashes int64, not date objects
+        change_day = changed["_LastStatusChangeDT"].dt.floor("D").rename("Change Date")
+        daily = change_day.value_counts(sort=False).sort_index().rename_axis("Change Date").reset_index(name="Count")
         fig_line = go.Figure()
         fig_line.add_trace(go.Scatter(x=daily["Change Date"], y=daily["Count"], mode="lines+markers",
                                       line=dict(color=BLUE)))
@@ -944,32 +1129,29 @@ with tabs[1]:
         show_chart(style_fig(fig_line, theme), key="st-daily-line")
 
         # --- Added daily breakdowns & age buckets ---
-        tmp = changed.copy()
-        tmp["Change Date"] = pd.to_datetime(tmp["_LastStatusChangeDT"]).dt.date
-
-        if "_LastStatusEvent" in tmp.columns:
-            ev_day = tmp.groupby(["Change Date","_LastStatusEvent"]).size().reset_index(name="Count")
+        if "_LastStatusEvent" in changed.columns:
+            ev_day = changed.groupby([change_day, "_LastStatusEvent"]).size().reset_index(name="Count")
             fig_ev_day = px.bar(ev_day, x="Change Date", y="Count", color="_LastStatusEvent",
                                 color_discrete_sequence=distinct_brand_colors(ev_day["_LastStatusEvent"].nunique()+2))
             fig_ev_day.update_layout(title="Per-day changes by Event")
             show_chart(style_fig(fig_ev_day, theme), key="st-ev-perday")
 
-        if "Current Status" in tmp.columns:
-            st_day = tmp.groupby(["Change Date","Current Status"]).size().reset_index(name="Count")
+        if "Current Status" in changed.columns:
+            st_day = changed.groupby([change_day, "Current Status"], observed=True).size().reset_index(name="Count")
             fig_st_day = px.bar(st_day, x="Change Date", y="Count", color="Current Status",
                                 color_discrete_sequence=distinct_brand_colors(st_day["Current Status"].nunique()+2))
             fig_st_day.update_layout(title="Per-day changes by Status")
             show_chart(style_fig(fig_st_day, theme), key="st-status-perday")
 
-        if "Project Name" in tmp.columns:
-            top_p = tmp.groupby("Project Name").size().reset_index(name="Changes").sort_values("Changes", ascending=False).head(15)
+        if "Project Name" in changed.columns:
+            top_p = changed.groupby("Project Name", observed=True).size().reset_index(name="Changes").sort_values("Changes", ascending=False).head(15)
             fig_top = px.bar(top_p.sort_values("Changes"), x="Changes", y="Project Name", orientation="h",
                              color_discrete_sequence=distinct_brand_colors(1), text_auto=True)
             fig_top.update_layout(title="Top Projects — # of Changes")
             show_chart(style_fig(fig_top, theme), key="st-top-projects")
 
-        if "_R2C_Flag" in tmp.columns and "Project Name" in tmp.columns:
-            r2 = tmp.groupby("Project Name")["_R2C_Flag"].sum().reset_index(name="R2C")
+        if "_R2C_Flag" in changed.columns and "Project Name" in changed.columns:
+            r2 = changed.groupby("Project Name", observed=True)["_R2C_Flag"].sum().reset_index(name="R2C")
             r2 = r2[r2["R2C"]>0].sort_values("R2C", ascending=False).head(15)
             if len(r2):
                 fig_r2p = px.bar(r2, x="Project Name", y="R2C",
@@ -997,32 +1179,27 @@ with tabs[1]:
             "Raised On Date","Raised On Time"
         ] if c in changed.columns]
         if show_cols:
-            view = changed[show_cols].rename(columns={
+            # Positions of the 1500 most recent changes, ordered by the timestamp column alone; only those rows are taken
+            newest = (changed["_LastStatusChangeDT"].reset_index(drop=True)
+                      .sort_values(ascending=False).index[:1500].to_numpy())
+            view = changed.take(newest)[show_cols].rename(columns={
                 "_LastStatusEvent":"Last Event",
                 "_LastStatusChangeDT":"Last Changed At"
-            }).sort_values("Last Changed At", ascending=False)
-            st.dataframe(view.head(1500), use_container_width=True)
+            })
+            st.dataframe(view, use_container_width=True)
 
 # ---------- Project Status ----------
-with tabs[2]:
+if active_section == "Project Status":
     st.header("Project Status")
     if "Project Name" in df_filtered.columns:
-        grp = df_filtered.groupby("Project Name").agg(
-            Total=("Reference ID","count") if "Reference ID" in df_filtered.columns else ("Project Name","count"),
-            Resolved=("_EffectiveResolutionDT", lambda x: x.notna().sum()),
-            R2C=("_R2C_Flag", "sum"),
-            RespOnly=("_RespondedNotClosed_Flag", "sum"),
-            Median_Close_Hrs=("Computed Closure Time (Hrs)", "median"),
-            SLA_Met=("SLA Met", "mean"),
-        ).reset_index()
-        if "SLA_Met" in grp.columns:
-            grp["SLA_Met"] = (grp["SLA_Met"] * 100).round(1)
+        grp = all_group_aggs(df_filtered)["Project Name"]
         st.dataframe(grp, use_container_width=True)
 
-        melted = grp.melt(id_vars=["Project Name"], value_vars=["Total","Resolved","R2C","RespOnly"], var_name="Metric", value_name="Count")
-        fig_proj = px.bar(melted, x="Project Name", y="Count", color="Metric", barmode="group",
+        # Wide-form bars: px reshapes the metric columns itself, so no melted copy of grp
+        bar_cols = GROUP_AGG_SPECS["Project Name"][1]
+        fig_proj = px.bar(grp, x="Project Name", y=bar_cols, barmode="group", labels=WIDE_BAR_LABELS,
                           title="Project — Total vs Resolved vs Rejected→Closed vs Responded-not-Closed",
-                          color_discrete_sequence=distinct_brand_colors(melted["Metric"].nunique()))
+                          color_discrete_sequence=distinct_brand_colors(len(bar_cols)))
         fig_proj.update_xaxes(tickangle=30, tickfont=dict(size=11))
         show_chart(style_fig(fig_proj, theme), key="tab1-project-bar")
 
@@ -1030,9 +1207,9 @@ with tabs[2]:
         if "Current Status" in df_filtered.columns:
             topN = min(20, len(grp))
             top_projects = grp.sort_values("Total", ascending=False).head(topN)["Project Name"].astype(str).tolist()
-            small = df_filtered[df_filtered["Project Name"].astype(str).isin(top_projects)].copy()
-            small["Current Status"] = small["Current Status"].fillna("—").astype(str)
-            stack = small.groupby(["Project Name","Current Status"]).size().reset_index(name="Count")
+            small = df_filtered[df_filtered["Project Name"].isin(top_projects)]
+            # Group on the category codes directly; "—" is a registered category, so fillna needs no string cast
+            stack = small.groupby(["Project Name", small["Current Status"].fillna("—")], observed=True).size().reset_index(name="Count")
             fig_stack = px.bar(stack, x="Project Name", y="Count", color="Current Status", text_auto=True,
                                color_discrete_sequence=distinct_brand_colors(stack["Current Status"].nunique()+2))
             fig_stack.update_layout(title="Top Projects — Status Mix (stacked)")
@@ -1049,7 +1226,7 @@ with tabs[2]:
         st.info("Column 'Project Name' not found.")
 
 # ---------- Project Explorer ----------
-with tabs[3]:
+if active_section == "Project Explorer":
     st.header("Project Explorer")
     c1, c2 = st.columns([1,2])
     with c1:
@@ -1071,10 +1248,11 @@ with tabs[3]:
             show_chart(bar_top_counts(work, "SLA State", template=THEMES[theme]["template"], theme_name=theme),
                        key="tab2-sla")
 
+        if "Assigned Team User" in df_filtered.columns:
+            by_assignee = flag_counts_by(df_filtered, "Assigned Team User", ["_R2C_Flag", "_RespondedNotClosed_Flag"])
+
         if "Assigned Team User" in df_filtered.columns and r2c_count_scope > 0:
-            counts = (df_filtered.loc[mask_r2c_inferred, "Assigned Team User"]
-                      .fillna("—").astype(str)
-                      .value_counts().rename_axis("Assignee").reset_index(name="Rejected→Closed"))
+            counts = by_assignee["_R2C_Flag"].rename_axis("Assignee").reset_index(name="Rejected→Closed")
             fig_r2c_scope = px.bar(counts.sort_values("Rejected→Closed"),
                                    x="Rejected→Closed", y="Assignee", orientation="h",
                                    title="Rejected → Closed — by Assignee (inferred, scope)",
@@ -1082,9 +1260,7 @@ with tabs[3]:
             show_chart(style_fig(fig_r2c_scope, theme), key="tab2-r2c-assignee")
 
         if "Assigned Team User" in df_filtered.columns and resp_only_count > 0:
-            resp_counts = (df_filtered.loc[mask_responly, "Assigned Team User"]
-                           .fillna("—").astype(str)
-                           .value_counts().rename_axis("Assignee").reset_index(name="Responded not Closed"))
+            resp_counts = by_assignee["_RespondedNotClosed_Flag"].rename_axis("Assignee").reset_index(name="Responded not Closed")
             fig_resp_scope = px.bar(resp_counts.sort_values("Responded not Closed"),
                                     x="Responded not Closed", y="Assignee", orientation="h",
                                     title="Responded but NOT Closed — by Assignee (scope)",
@@ -1093,7 +1269,7 @@ with tabs[3]:
 
     # ---- Added Per-project snapshots (donuts + distribution + heatmap) ----
     st.subheader("Per-project Snapshots")
-    projects = sorted(df_filtered.get("Project Name", pd.Series(dtype=str)).dropna().astype(str).unique().tolist())
+    projects = used_categories(df_filtered["Project Name"]) if "Project Name" in df_filtered.columns else []
     sel_proj = st.selectbox("Select a project", ["(All)"]+projects, index=0, key="pe-proj")
     df_scope = df_filtered if sel_proj=="(All)" else df_filtered[df_filtered["Project Name"].astype(str)==sel_proj]
 
@@ -1154,32 +1330,26 @@ with tabs[3]:
             show_chart(style_fig(fig, theme), key="pe-heatmap-l1")
 
 # ---------- Tower-Wise ----------
-with tabs[4]:
+if active_section == "Tower-Wise":
     st.header("Tower-Wise")
     tower_col = "Location L1" if "Location L1" in df_filtered.columns else None
 
     if tower_col:
-        grp = df_filtered.groupby(tower_col).agg(
-            Total=("Reference ID","count") if "Reference ID" in df_filtered.columns else (tower_col,"count"),
-            Resolved=("_EffectiveResolutionDT", lambda x: x.notna().sum()),
-            R2C=("_R2C_Flag", "sum"),
-            RespOnly=("_RespondedNotClosed_Flag", "sum"),
-        ).reset_index()
+        grp = all_group_aggs(df_filtered)[tower_col]
         st.dataframe(grp.sort_values("Total", ascending=False), use_container_width=True)
 
-        melted = grp.melt(id_vars=[tower_col], value_vars=["Total","Resolved","R2C","RespOnly"], var_name="Metric", value_name="Count")
-        fig_tower = px.bar(melted, x=tower_col, y="Count", color="Metric", barmode="group",
+        bar_cols = GROUP_AGG_SPECS[tower_col][1]
+        fig_tower = px.bar(grp, x=tower_col, y=bar_cols, barmode="group", labels=WIDE_BAR_LABELS,
                            title="Tower — Total vs Resolved vs Rejected→Closed vs Responded-not-Closed",
-                           color_discrete_sequence=distinct_brand_colors(melted["Metric"].nunique()))
+                           color_discrete_sequence=distinct_brand_colors(len(bar_cols)))
         fig_tower.update_xaxes(tickangle=30, tickfont=dict(size=11))
         show_chart(style_fig(fig_tower, theme), key="tab3-tower-group")
 
         # ---- Added: Stacked status per tower + heatmap ----
         if "Current Status" in df_filtered.columns:
             top_t = grp.sort_values("Total", ascending=False).head(15)[tower_col].astype(str).tolist()
-            small = df_filtered[df_filtered[tower_col].astype(str).isin(top_t)].copy()
-            small["Current Status"] = small["Current Status"].fillna("—").astype(str)
-            stack = small.groupby([tower_col, "Current Status"]).size().reset_index(name="Count")
+            small = df_filtered[df_filtered[tower_col].isin(top_t)]
+            stack = small.groupby([tower_col, small["Current Status"].fillna("—")], observed=True).size().reset_index(name="Count")
             fig2 = px.bar(stack, x=tower_col, y="Count", color="Current Status", text_auto=True,
                           color_discrete_sequence=distinct_brand_colors(stack["Current Status"].nunique()+2))
             fig2.update_layout(title="Top Towers — Status mix (stacked)")
@@ -1197,25 +1367,19 @@ with tabs[4]:
         st.info("Column 'Location L1' not found.")
 
 # ---------- User-Wise ----------
-with tabs[5]:
+if active_section == "User-Wise":
     st.header("User-Wise")
 
     if "Assigned Team User" in df_filtered.columns:
-        usr = df_filtered.groupby("Assigned Team User").agg(
-            Total=("Reference ID","count") if "Reference ID" in df_filtered.columns else ("Assigned Team User","count"),
-            Resolved=("_EffectiveResolutionDT", lambda x: x.notna().sum()),
-            R2C=("_R2C_Flag", "sum"),
-            RespOnly=("_RespondedNotClosed_Flag", "sum"),
-            Median_Close_Hrs=("Computed Closure Time (Hrs)", "median"),
-        ).reset_index()
+        usr = all_group_aggs(df_filtered)["Assigned Team User"]
+        # Long form kept here: the Top-N cut and the Count-sorted bar order work on (user, metric) rows
+        long_u = usr.melt(id_vars=["Assigned Team User"], value_vars=GROUP_AGG_SPECS["Assigned Team User"][1],
+                          var_name="Metric", value_name="Count")
 
         maxN = max(1, len(usr))
         topN = st.slider("Top N users (grouped bar)", 5, max(5, maxN), min(25, maxN), key="uw-topn")
 
-        long_u = usr.melt(id_vars=["Assigned Team User"], value_vars=["Resolved","R2C","RespOnly"],
-                          var_name="Metric", value_name="Count")
-
-        tot = long_u.groupby("Assigned Team User")["Count"].sum().sort_values(ascending=False).head(topN).index
+        tot = long_u.groupby("Assigned Team User", observed=True)["Count"].sum().sort_values(ascending=False).head(topN).index
         long_u_top = long_u[long_u["Assigned Team User"].isin(tot)]
 
         fig_u_grp = px.bar(long_u_top.sort_values("Count"),
@@ -1254,7 +1418,7 @@ with tabs[5]:
         if strict_rows.any():
             med = (df_filtered.loc[strict_rows, ["Assigned Team User","R2C Hours (>=0)"]]
                    .dropna()
-                   .groupby("Assigned Team User")["R2C Hours (>=0)"]
+                   .groupby("Assigned Team User", sort=False, observed=True)["R2C Hours (>=0)"]
                    .median()
                    .reset_index()
                    .rename(columns={"R2C Hours (>=0)":"Median Hours to Close after Rejection"}))
@@ -1293,7 +1457,7 @@ with tabs[5]:
             st.info("No Responded-not-Closed raised-by reminders with count > 1 in current filters.")
 
 # ---------- Activity-Wise ----------
-with tabs[6]:
+if active_section == "Activity-Wise":
     st.header("Activity-Wise")
     st.caption("Totals + R→C (inferred) + Responded-not-Closed; brand gradient for %R→C (White→Blue→Black).")
 
@@ -1301,9 +1465,9 @@ with tabs[6]:
     def grouped_measures_for(df_data: pd.DataFrame, by_col: str, key_prefix: str, show_ratio: bool = True, topn: int = 20):
         if by_col not in df_data.columns:
             return
-        agg = df_data.groupby(by_col).agg(
+        agg = df_data.groupby(by_col, observed=True).agg(
             Total=("Reference ID","count") if "Reference ID" in df_data.columns else (by_col,"count"),
-            Resolved=("_EffectiveResolutionDT", lambda x: x.notna().sum()),
+            Resolved=("_Resolved_Flag", "sum"),
             R2C=("_R2C_Flag", "sum"),
             RespOnly=("_RespondedNotClosed_Flag", "sum"),
         ).reset_index()
@@ -1311,11 +1475,10 @@ with tabs[6]:
         agg["R2C%"] = np.where(agg["Total"]>0, agg["R2C"]/agg["Total"]*100, np.nan)
         agg = agg.sort_values("Total", ascending=False).head(topn)
 
-        melted = agg.melt(id_vars=[by_col], value_vars=["Total","R2C","RespOnly"], var_name="Metric", value_name="Count")
         fig = px.bar(
-            melted, x=by_col, y="Count", color="Metric", barmode="group",
+            agg, x=by_col, y=["Total","R2C","RespOnly"], barmode="group", labels=WIDE_BAR_LABELS,
             title=f"{by_col} — Total vs R→C vs Responded-not-Closed (Top {topn})",
-            color_discrete_sequence=distinct_brand_colors(melted["Metric"].nunique()),
+            color_discrete_sequence=distinct_brand_colors(3),
             text_auto=True
         )
         fig.update_xaxes(tickangle=30, tickfont=dict(size=10))
@@ -1445,9 +1608,8 @@ with tabs[6]:
         # Optional: show distribution across status for the selected top items
         if "Current Status" in df_filtered.columns and len(vc):
             tops = vc[pick].astype(str).tolist()
-            small = df_filtered[df_filtered[pick].astype(str).isin(tops)].copy()
-            small["Current Status"] = small["Current Status"].fillna("—").astype(str)
-            dist = small.groupby([pick, "Current Status"]).size().reset_index(name="Count")
+            small = df_filtered[df_filtered[pick].astype(str).isin(tops)]
+            dist = small.groupby([pick, small["Current Status"].fillna("—")], observed=True).size().reset_index(name="Count")
             fig2 = px.bar(dist, x="Count", y=pick, color="Current Status", orientation="h",
                           title=f"Status Mix for Top {pick}",
                           color_discrete_sequence=distinct_brand_colors(dist["Current Status"].nunique()+2),
@@ -1455,32 +1617,24 @@ with tabs[6]:
             show_chart(style_fig(fig2, theme), key="all-recur-statusmix")
 
 # ---------- Timelines (extended) ----------
-with tabs[7]:
+if active_section == "Timelines":
     st.header("Timelines (light)")
     if "_RaisedOnDT" in df_filtered.columns:
-        work = df_filtered.copy()
-        work["Date"] = work["_RaisedOnDT"].dt.date
-        series = work.groupby("Date").agg(
-            Raised=("Reference ID", "count") if "Reference ID" in work.columns else ("Date","count"),
-            Resolved=("_EffectiveResolutionDT", lambda x: x.notna().sum()),
-            R2C=("_R2C_Flag", "sum"),
-            RespOnly=("_RespondedNotClosed_Flag", "sum"),
-        ).reset_index()
+        series = timeline_agg(df_filtered)
+        # One ISO-string x axis shared by every trace (Plotly serializes date objects element by element, per trace)
+        day_axis = series["Date"].astype(str).to_numpy(dtype=str)
         fig2 = go.Figure()
         mc = metric_colors
-        fig2.add_trace(go.Scatter(x=series["Date"], y=series["Raised"], mode="lines", name="Raised", line=dict(color=mc["Total"])))
-        fig2.add_trace(go.Scatter(x=series["Date"], y=series["Resolved"], mode="lines", name="Resolved", line=dict(color=mc["Resolved"])))
-        fig2.add_trace(go.Scatter(x=series["Date"], y=series["R2C"], mode="lines", name="Rejected→Closed", line=dict(color=mc["R2C"])))
-        fig2.add_trace(go.Scatter(x=series["Date"], y=series["RespOnly"], mode="lines", name="Responded-not-Closed", line=dict(color=mc["RespOnly"])))
+        fig2.add_trace(go.Scatter(x=day_axis, y=series["Raised"], mode="lines", name="Raised", line=dict(color=mc["Total"])))
+        fig2.add_trace(go.Scatter(x=day_axis, y=series["Resolved"], mode="lines", name="Resolved", line=dict(color=mc["Resolved"])))
+        fig2.add_trace(go.Scatter(x=day_axis, y=series["R2C"], mode="lines", name="Rejected→Closed", line=dict(color=mc["R2C"])))
+        fig2.add_trace(go.Scatter(x=day_axis, y=series["RespOnly"], mode="lines", name="Responded-not-Closed", line=dict(color=mc["RespOnly"])))
         fig2.update_layout(title="Daily Flow — Raised vs Resolved vs R→C vs Responded-not-Closed")
         show_chart(style_fig(fig2, theme), key="tab6-lines")
 
         # ---- Added: Backlog area + Calendar heatmap ----
-        series["RaisedCum"]   = series["Raised"].cumsum()
-        series["ResolvedCum"] = series["Resolved"].cumsum()
-        series["Backlog"]     = series["RaisedCum"] - series["ResolvedCum"]
         area = go.Figure()
-        area.add_trace(go.Scatter(x=series["Date"], y=series["Backlog"], name="Open Backlog", mode="lines",
+        area.add_trace(go.Scatter(x=day_axis, y=series["Backlog"], name="Open Backlog", mode="lines",
                                   fill="tozeroy", line=dict(width=0.5, color=distinct_brand_colors(1)[0])))
         area.update_layout(title="Open Backlog (cumulative)")
         show_chart(style_fig(area, theme), key="tl-backlog")
@@ -1500,11 +1654,11 @@ with tabs[7]:
 # ---------- NC-View ----------
 # ---------- NC-View ----------
 # ---------- NC-View ----------
-with tabs[8]:
+if active_section == "NC-View":
     st.header("NC-View")
 
     # ---- Scope by project (optional) ----
-    proj_opts = sorted(df_filtered.get("Project Name", pd.Series(dtype=str)).dropna().astype(str).unique().tolist())
+    proj_opts = used_categories(df_filtered["Project Name"]) if "Project Name" in df_filtered.columns else []
     sel_proj = st.selectbox("Filter by Project (optional)", ["(All)"] + proj_opts, index=0, key="nc-proj-ncview")
     df_scope = df_filtered if sel_proj == "(All)" else df_filtered[df_filtered.get("Project Name", "").astype(str) == sel_proj]
 
@@ -1547,10 +1701,12 @@ with tabs[8]:
             st.info("No NCs match your search and filters.")
             row = pd.DataFrame()
         else:
+            # Option key → label, looked up by format_func for each option
+            labels = dict(zip(opt_df["_idx"].tolist(), opt_df["_label"].tolist()))
             sel_idx = st.selectbox(
                 "Select an NC",
-                options=opt_df["_idx"].tolist(),
-                format_func=lambda i: opt_df.loc[opt_df["_idx"] == i, "_label"].values[0],
+                options=list(labels),
+                format_func=labels.__getitem__,
                 key="nc-ref-ncview"   # ✅ unique key
             )
             # ✅ FIX: label-based selection (not iloc)
@@ -1753,7 +1909,7 @@ with tabs[8]:
 
 
 # ---------- Sketch-View (Treemap) ----------
-with tabs[9]:
+if active_section == "Sketch-View":
     st.header("Sketch-View")
     st.caption("Treemap from 'Location / Reference' (pre-aggregated). Brand palette only.")
 
@@ -1768,10 +1924,10 @@ with tabs[9]:
 
         @st.cache_data(show_spinner=False)
         def build_levels(df_src: pd.DataFrame, col: str, depth: int) -> pd.DataFrame:
-            parts = df_src[col].fillna("").astype(str).str.split("/")
-            out = pd.DataFrame(index=df_src.index)
-            for i in range(depth):
-                out[f"Level_{i}"] = parts.str[i].fillna("").str.strip().where(parts.str.len() > i, "")
+            # One split pass; n=depth keeps any deeper remainder out of the last kept level
+            parts = df_src[col].fillna("").astype(str).str.split("/", n=depth, expand=True)
+            parts = parts.reindex(columns=range(depth)).fillna("")  # shallower paths → blank levels
+            out = pd.DataFrame({f"Level_{i}": parts[i].astype(str).str.strip() for i in range(depth)}, index=df_src.index)
             out["Count"] = 1
             return out
 
@@ -1830,7 +1986,13 @@ with tabs[9]:
 
         st.subheader("Issues at Selected Path")
         selected = st.text_input("Filter by path contains", "", key="sketch-filter")
-        view = df_filtered[df_filtered[path_col].str.contains(selected, case=False, na=False)] if selected else df_filtered
+        if selected:
+            # Literal, case-insensitive match over the distinct paths only; codes map the hits back to rows
+            codes, uniques = pd.factorize(df_filtered[path_col])
+            hit = pd.Index(uniques).astype(str).str.contains(selected, case=False, regex=False)
+            view = df_filtered[np.append(np.asarray(hit, dtype=bool), False)[codes]]  # code -1 (missing) → last slot
+        else:
+            view = df_filtered
 
         show_cols = [c for c in [
             "Reference ID","Project Name", path_col, "Location Variable (Fixed)",
@@ -1844,7 +2006,9 @@ with tabs[9]:
             st.info("No issues match the selected filter.")
 
 # ---------- NC Table ----------
-with tabs[10]:
+SHADED_TABLE_ROWS = 500  # Styler CSS is built per cell, so shading is limited to a smaller window
+
+if active_section == "NC Table":
     st.header("NC Table")
     st.caption("Styled table with row shading by Current Status (brand colours).")
     shade = st.toggle("Enable row shading", value=False, key="tbl-shade")
@@ -1872,13 +2036,14 @@ with tabs[10]:
     else:
         view = df_filtered[display_cols]
         if shade:
+            # Native (virtualized) grid with the Styler applied to the visible window only — no HTML table to reflow
+            st.caption(f"Row shading covers the first {SHADED_TABLE_ROWS} rows.")
             try:
-                st.write(style_status_rows(view.head(1500), theme).to_html(), unsafe_allow_html=True)
+                st.dataframe(style_status_rows(view.head(SHADED_TABLE_ROWS), theme), use_container_width=True)
             except Exception:
                 st.dataframe(view.head(1500), use_container_width=True)
         else:
             st.dataframe(view.head(1500), use_container_width=True)
-        csv_data = view.to_csv(index=False).encode("utf-8")
-        st.download_button("⬇️ Download filtered table (CSV)", data=csv_data, file_name="digiqc_filtered.csv", mime="text/csv", key="dl-full-table")
+        st.download_button("⬇️ Download filtered table (CSV)", data=csv_bytes(view), file_name="digiqc_filtered.csv", mime="text/csv", key="dl-full-table")
 
 st.caption("© Digital Issue Dashboard — Streamlit (SJCPL Brand) — V2.7")